@@ -2,7 +2,11 @@ from __future__ import annotations
 
 import time
 import re
+import warnings
 import json
+import hashlib
+import io
+import os
 from pathlib import Path
 from datetime import datetime, timezone
 
@@ -10,12 +14,25 @@ import numpy as np
 import pandas as pd
 import yfinance as yf
 
+try:
+    # yfinance 0.2.5x 以降は curl_cffi のセッションしか受け付けない
+    from curl_cffi import requests as curl_requests
+except ImportError:
+    curl_requests = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba は任意（大きいユニバースの相関dedupだけで使う）
+    njit = None
+
 UNIVERSE_CSV = "universe.csv"
 
 TOP_N = 3
 MA_MONTHS = 10
 MOM_MONTHS = 12
 CORR_THRESHOLD = 0.95
+# この銘柄数以上で numba があれば相関dedupをJITカーネルで行う
+NUMBA_MIN_TICKERS = 1000
 
 LIQ_THRESHOLD_JPY = 50_000_000
 LIQ_THRESHOLD_USD = 1_000_000
@@ -24,6 +41,10 @@ LIQ_THRESHOLD_USD = 1_000_000
 PERIOD = "15y"
 RETRY = 3
 SLEEP_SEC = 2
+# 並列ダウンロード数（各スレッドがセッション内の自分の接続を使い回す）
+DOWNLOAD_THREADS = 16
+# キャッシュ末尾と重ねて再取得する営業日数（配当・分割で調整後価格が変わったら全取得し直す）
+CACHE_OVERLAP_DAYS = 5
 
 # “運用資金（注文数量計算の基準）”
 # 本当は口座残高を入れるべきだが、自動化の第一段階では元本固定でよい（裁量排除）
@@ -31,38 +52,48 @@ PORTFOLIO_VALUE_NATIVE = 1_000_000.0
 
 OUT_DIR = Path("out")
 HIST_DIR = OUT_DIR / "history"
+CACHE_DIR = OUT_DIR / "cache"
 OUT_DIR.mkdir(exist_ok=True)
 HIST_DIR.mkdir(exist_ok=True)
+CACHE_DIR.mkdir(exist_ok=True)
+
+PICKS_NAME_RE = re.compile(r"picks_(\d{4}-\d{2}-\d{2})$")
 
 # =====================================================
 
 
 def load_universe(path: str) -> list[str]:
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, usecols=lambda c: c == "ticker", dtype={"ticker": "string"})
     if "ticker" not in df.columns:
         raise ValueError(f"{path} must have 'ticker' column")
 
-    tickers = [str(t).strip() for t in df["ticker"].dropna().tolist()]
-    seen = set()
-    out: list[str] = []
-    for t in tickers:
-        if t and t not in seen:
-            out.append(t)
-            seen.add(t)
-    return out
+    s = df["ticker"].dropna().str.strip()
+    s = s[s != ""]
+    return s.drop_duplicates().tolist()
 
 
-def download_prices(tickers: list[str]) -> pd.DataFrame:
+def _yf_session():
+    """
+    1回の実行で使い回すHTTPセッション（TLS/keep-aliveを再利用）。
+    curl_cffi が無ければ None（yfinance 既定のセッション）。
+    """
+    if curl_requests is None:
+        return None
+    return curl_requests.Session(impersonate="chrome")
+
+
+def _yf_download(tickers: list[str], session, **kwargs) -> pd.DataFrame:
     last_err = None
     for _ in range(RETRY):
         try:
             df = yf.download(
                 tickers=tickers,
-                period=PERIOD,
                 auto_adjust=True,
                 group_by="ticker",
-                threads=True,
+                threads=max(1, min(DOWNLOAD_THREADS, len(tickers))),
                 progress=False,
+                session=session,
+                **kwargs,
             )
             if df is None or df.empty:
                 raise RuntimeError("yfinance returned empty dataframe")
@@ -73,34 +104,138 @@ def download_prices(tickers: list[str]) -> pd.DataFrame:
     raise RuntimeError(f"download failed after {RETRY} retries: {last_err}")
 
 
-def get_field(df: pd.DataFrame, field: str, tickers: list[str]) -> pd.DataFrame:
+def _trim_to_period(df: pd.DataFrame) -> pd.DataFrame:
+    m = re.fullmatch(r"(\d+)y", PERIOD)
+    if not m:
+        return df
+    return df.loc[df.index >= df.index[-1] - pd.DateOffset(years=int(m.group(1)))]
+
+
+def download_prices(tickers: list[str]) -> pd.DataFrame:
+    """
+    out/cache/prices_<key>.parquet に日次データをキャッシュし、
+    2回目以降はキャッシュ末尾からの差分だけ取得する。
+    重なり部分の終値がずれていたら（配当・分割の再調整）全期間を取り直す。
+    """
+    key = hashlib.md5((",".join(sorted(tickers)) + "|" + PERIOD).encode()).hexdigest()[:12]
+    cache_path = CACHE_DIR / f"prices_{key}.parquet"
+    session = _yf_session()
+
+    if cache_path.exists():
+        cached = pd.read_parquet(cache_path)
+        if len(cached) > CACHE_OVERLAP_DAYS:
+            overlap = cached.iloc[-CACHE_OVERLAP_DAYS:-1]
+            delta = _yf_download(tickers, session, start=overlap.index[0].strftime("%Y-%m-%d"))
+            cols = [c for c in overlap.columns if "Close" in (c if isinstance(c, tuple) else (c,))]
+            new_overlap = delta.reindex(index=overlap.index, columns=cols)
+            if np.allclose(overlap[cols].to_numpy(dtype=float), new_overlap.to_numpy(dtype=float),
+                           rtol=1e-6, equal_nan=True):
+                df = pd.concat([cached.loc[cached.index < delta.index[0]], delta.reindex(columns=cached.columns)])
+                df = _trim_to_period(df)
+                df.to_parquet(cache_path)
+                return df
+
+    df = _yf_download(tickers, session, period=PERIOD)
+    df.to_parquet(cache_path)
+    return df
+
+
+def get_fields(df: pd.DataFrame, fields: list[str], tickers: list[str]) -> dict[str, pd.DataFrame]:
     """
     yfinanceの返りが
       - MultiIndex: (ticker, field) か (field, ticker)
       - 単一ticker: 通常カラム
-    のどちらでも動くように吸収
+    のどちらでも動くように吸収。
+    MultiIndex は field を外側レベルにそろえて1回ソートし、各fieldはスライスで取り出す。
     """
     if isinstance(df.columns, pd.MultiIndex):
-        # 典型: (ticker, field)
-        try:
-            out = df.xs(field, axis=1, level=1, drop_level=True)
-        except Exception:
-            # 逆: (field, ticker)
-            out = df.xs(field, axis=1, level=0, drop_level=True)
-
-        cols = [t for t in tickers if t in out.columns]
-        return out[cols]
+        # 典型: (ticker, field) → (field, ticker) に入れ替え
+        if fields[0] in df.columns.get_level_values(1):
+            df = df.swaplevel(0, 1, axis=1)
+        df = df.sort_index(axis=1)
+
+        out: dict[str, pd.DataFrame] = {}
+        for f in fields:
+            block = df[f]
+            cols = [t for t in tickers if t in block.columns]
+            out[f] = block[cols]
+        return out
 
     # 単一ticker
-    if field not in df.columns:
-        raise KeyError(f"field {field} not in columns: {df.columns}")
-    out = df[[field]].copy()
-    out.columns = [tickers[0]]
+    out = {}
+    for f in fields:
+        if f not in df.columns:
+            raise KeyError(f"field {f} not in columns: {df.columns}")
+        block = df[[f]].copy()
+        block.columns = [tickers[0]]
+        out[f] = block
     return out
 
 
-def liquidity_threshold(ticker: str) -> float:
-    return LIQ_THRESHOLD_JPY if ticker.endswith(".T") else LIQ_THRESHOLD_USD
+def pearson_corr(ret: pd.DataFrame) -> pd.DataFrame:
+    """
+    DataFrame.corr() と同じ pairwise（両方そろっている月だけ）のPearson相関を
+    行列積（BLAS）でまとめて計算する。
+    """
+    x = ret.to_numpy(dtype=np.float64)
+    m = (~np.isnan(x)).astype(np.float64)
+    # 列ごとに最初の値を引いておく（相関は不変、桁落ち防止・定数列は厳密に0）
+    first = x[np.argmax(m > 0, axis=0), np.arange(x.shape[1])]
+    x = x - np.nan_to_num(first)
+    x0 = np.where(m > 0, x, 0.0)
+
+    n = m.T @ m
+    sx = x0.T @ m            # sx[i, j]: i,j 両方ある月の x_i の和
+    sxx = (x0 * x0).T @ m
+    sxy = x0.T @ x0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx * sx / n
+        r = cov / np.sqrt(var_x * var_x.T)
+    r[n < 2] = np.nan
+    r = np.clip(r, -1.0, 1.0)
+    np.fill_diagonal(r, np.where(np.diag(var_x) > 0, 1.0, np.nan))
+    return pd.DataFrame(r, index=ret.columns, columns=ret.columns)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _dedup_kernel(c, tv, thr):
+        n = c.shape[0]
+        drop = np.zeros(n, np.bool_)
+        for i in prange(n):
+            for j in range(i + 1, n):
+                cij = c[i, j]
+                if cij == cij and cij >= thr:
+                    if tv[i] < tv[j]:
+                        drop[i] = True
+                    else:
+                        drop[j] = True
+        return drop
+
+
+def corr_dedup(corr: pd.DataFrame, traded_value: pd.Series, threshold: float) -> set[str]:
+    """
+    相関が threshold 以上のペア（上三角 i<j）について、流動性の低い方を落とす銘柄の集合を返す。
+    N が大きく numba がある場合は N×N の一時配列を作らない並列カーネルを使う。
+    """
+    c_arr = corr.to_numpy(dtype=np.float64)
+    # 売買代金が欠損の銘柄は最も流動性が低い扱い（ペアの相手を残す）
+    tv = traded_value.reindex(corr.columns).fillna(-np.inf).to_numpy(dtype=np.float64)
+    cols_arr = np.asarray(corr.columns)
+
+    if njit is not None and len(cols_arr) >= NUMBA_MIN_TICKERS:
+        return set(cols_arr[_dedup_kernel(c_arr, tv, threshold)].tolist())
+
+    mask = np.triu(np.nan_to_num(c_arr, nan=-1.0) >= threshold, k=1)
+    ii, jj = np.where(mask)
+    drops = np.where(tv[ii] < tv[jj], cols_arr[ii], cols_arr[jj])
+    return set(drops.tolist())
+
+
+def liquidity_threshold(tickers: pd.Index) -> np.ndarray:
+    return np.where(tickers.str.endswith(".T"), LIQ_THRESHOLD_JPY, LIQ_THRESHOLD_USD)
 
 
 def load_prev_picks_from_history(hist_dir: Path, cur_asof: str) -> pd.DataFrame:
@@ -113,7 +248,7 @@ def load_prev_picks_from_history(hist_dir: Path, cur_asof: str) -> pd.DataFrame:
         return pd.DataFrame(columns=["Ticker"])
 
     def extract_date(p: Path) -> str:
-        m = re.match(r"picks_(\d{4}-\d{2}-\d{2})$", p.stem)
+        m = PICKS_NAME_RE.match(p.stem)
         return m.group(1) if m else ""
 
     dated = [(extract_date(f), f) for f in files]
@@ -155,11 +290,12 @@ def build_orders(
     add = sorted(cur_set - prev_set)
     drop = sorted(prev_set - cur_set)
 
+    px_map = dict(zip(last_prices.index.astype(str), last_prices.to_numpy(dtype=float)))
     orders: list[dict] = []
 
     # DROP（全売却）
     for t in drop:
-        px = last_prices.get(t, np.nan)
+        px = px_map.get(t, np.nan)
         orders.append(
             {
                 "Ticker": t,
@@ -175,7 +311,7 @@ def build_orders(
     if len(add) > 0:
         target_per = np.floor((portfolio_value_native / top_n) / 1000.0) * 1000.0
         for t in add:
-            px = last_prices.get(t, np.nan)
+            px = px_map.get(t, np.nan)
             if pd.isna(px) or px <= 0:
                 qty = ""
                 note = "Price missing -> set qty manually"
@@ -199,27 +335,62 @@ def build_orders(
     return df
 
 
+def dump_bytes(blob: bytes, latest: Path, hist: Path):
+    """
+    エンコード済みの blob を latest に書き、history 側へハードリンクする
+    （リンク不可なら同じ blob をそのまま書く）。
+    latest は毎回 os.replace で新しい inode になるので、過去の履歴は上書きされない。
+    """
+    tmp = latest.with_name(latest.name + ".tmp")
+    tmp.write_bytes(blob)
+    os.replace(tmp, latest)
+
+    hist.unlink(missing_ok=True)
+    try:
+        os.link(latest, hist)
+    except OSError:
+        hist.write_bytes(blob)
+
+
+def dump_csv(df: pd.DataFrame, latest: Path, hist: Path):
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8-sig")
+    dump_bytes(buf.getvalue(), latest, hist)
+
+
+def dump_text(text: str, latest: Path, hist: Path):
+    dump_bytes(text.encode("utf-8"), latest, hist)
+
+
 def main():
     tickers = load_universe(UNIVERSE_CSV)
     if len(tickers) < 3:
         raise ValueError("universe must contain at least 3 tickers")
 
     raw = download_prices(tickers)
-    close_d = get_field(raw, "Close", tickers)
-    vol_d = get_field(raw, "Volume", tickers)
+    cv = get_fields(raw, ["Close", "Volume"], tickers)
+    close_d, vol_d = cv["Close"], cv["Volume"]
+    # 以降の集計は float32 で十分（帯域・メモリ半減）。和を取る箇所は float64 で累積する
+    close_d = close_d.astype(np.float32, copy=False)
+    vol_d = vol_d.astype(np.float32, copy=False)
 
     # 流動性：直近60営業日の平均売買代金（終値×出来高）
-    traded_value_60d = (close_d * vol_d).rolling(60).mean().iloc[-1]
+    # 最後の1行しか使わないので rolling せず末尾60行だけで平均する
+    # 休場・売買停止などの欠損日は除いて平均する（60日すべて欠損なら NaN）
+    tv_60 = close_d.tail(60).to_numpy(np.float32) * vol_d.tail(60).to_numpy(np.float32)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        tv_mean = np.nanmean(tv_60, axis=0, dtype=np.float64)
+    traded_value_60d = pd.Series(tv_mean, index=close_d.columns)
 
-    liq_ok = pd.Series(False, index=traded_value_60d.index)
-    for t in liq_ok.index:
-        thr = liquidity_threshold(t)
-        val = traded_value_60d.get(t, np.nan)
-        if pd.notna(val) and val >= thr:
-            liq_ok.loc[t] = True
+    thr = liquidity_threshold(traded_value_60d.index)
+    liq_ok = pd.Series(traded_value_60d.fillna(-np.inf).to_numpy() >= thr, index=traded_value_60d.index)
 
     # 月末終値（カレンダー月末で最後の取引日）
-    close_m = close_d.resample("ME").last()
+    # resample はビン格子を作るので、年月キーの groupby で各月の最終値を取る
+    month = close_d.index.to_period("M")
+    close_m = close_d.groupby(month).last()
+    close_m.index = close_m.index.to_timestamp(how="end").normalize()
 
     # 当月途中は落とす（未確定月を混ぜない）
     last_month_start = close_m.index[-1].to_period("M").to_timestamp()
@@ -230,23 +401,18 @@ def main():
     if len(close_m) < (max(MA_MONTHS, MOM_MONTHS) + 2):
         raise ValueError("not enough monthly history for MA/Momentum")
 
-    ma = close_m.rolling(MA_MONTHS).mean()
-    mom = close_m / close_m.shift(MOM_MONTHS) - 1
-    trend_ok = close_m > ma
+    # 順位付けに使うのは最終月だけなので、rolling/shift の全期間パネルは作らない
+    cm = close_m.to_numpy()
+    close_last = cm[-1]
+    ma_last = pd.Series(cm[-MA_MONTHS:].mean(axis=0, dtype=np.float64), index=close_m.columns)
+    mom_last = pd.Series(close_last / cm[-MOM_MONTHS - 1] - 1, index=close_m.columns)
+    trend_ok_last = pd.Series(close_last > ma_last.to_numpy(), index=close_m.columns)
 
     # 重複排除（相関）
     ret_m = close_m.pct_change().dropna(how="all")
-    corr = ret_m.corr()
-
-    to_drop = set()
-    cols = list(corr.columns)
-    for i in range(len(cols)):
-        for j in range(i + 1, len(cols)):
-            a, b = cols[i], cols[j]
-            c = corr.loc[a, b]
-            if pd.notna(c) and c >= CORR_THRESHOLD:
-                drop = a if traded_value_60d.get(a, -np.inf) < traded_value_60d.get(b, -np.inf) else b
-                to_drop.add(drop)
+    corr = pearson_corr(ret_m)
+
+    to_drop = corr_dedup(corr, traded_value_60d, CORR_THRESHOLD)
 
     final = [t for t in tickers if bool(liq_ok.get(t, False)) and t not in to_drop]
     if len(final) == 0:
@@ -256,24 +422,27 @@ def main():
     asof = latest.strftime("%Y-%m-%d")
 
     # ASOF txt（latest + 履歴）
-    (OUT_DIR / "asof_latest.txt").write_text(asof + "\n", encoding="utf-8")
-    (HIST_DIR / f"asof_{asof}.txt").write_text(asof + "\n", encoding="utf-8")
+    dump_text(asof + "\n", OUT_DIR / "asof_latest.txt", HIST_DIR / f"asof_{asof}.txt")
 
+    tix = pd.Index(tickers)
     table = pd.DataFrame(
         {
             "close": close_m.loc[latest],
-            f"ma{MA_MONTHS}": ma.loc[latest],
-            f"mom{MOM_MONTHS}": mom.loc[latest],
-            "trend_ok": trend_ok.loc[latest],
-            "score": np.where(trend_ok.loc[latest], mom.loc[latest], -np.inf),
+            f"ma{MA_MONTHS}": ma_last,
+            f"mom{MOM_MONTHS}": mom_last,
+            "trend_ok": trend_ok_last,
+            "score": np.where(trend_ok_last, mom_last, -np.inf),
             "avg_traded_value_60d_native": traded_value_60d,
             "liq_ok": liq_ok,
-            "dup_drop": pd.Series({t: (t in to_drop) for t in tickers}),
-            "in_final": pd.Series({t: (t in final) for t in tickers}),
+            "dup_drop": pd.Series(tix.isin(list(to_drop)), index=tix),
+            "in_final": pd.Series(tix.isin(final), index=tix),
         }
     )
 
-    ranked = table.loc[final].sort_values(["trend_ok", f"mom{MOM_MONTHS}"], ascending=[False, False]).copy()
+    # trend_ok(True優先) → mom 降順。ranking には全件の順位が要るので部分選択ではなく lexsort 1回
+    sub = table.loc[final]
+    order = np.lexsort((-sub[f"mom{MOM_MONTHS}"].to_numpy(dtype=float), ~sub["trend_ok"].to_numpy(dtype=bool)))
+    ranked = sub.iloc[order].copy()
     ranked["rank"] = np.arange(1, len(ranked) + 1, dtype=float)
     ranked["pick"] = ranked["rank"] <= TOP_N
 
@@ -289,10 +458,8 @@ def main():
     picks_hist = HIST_DIR / f"picks_{asof}.csv"
     meta_hist = HIST_DIR / f"meta_{asof}.csv"
 
-    ranked_out.to_csv(ranked_latest, index=False, encoding="utf-8-sig")
-    picks_out.to_csv(picks_latest, index=False, encoding="utf-8-sig")
-    ranked_out.to_csv(ranked_hist, index=False, encoding="utf-8-sig")
-    picks_out.to_csv(picks_hist, index=False, encoding="utf-8-sig")
+    dump_csv(ranked_out, ranked_latest, ranked_hist)
+    dump_csv(picks_out, picks_latest, picks_hist)
 
     meta = pd.DataFrame(
         [
@@ -310,8 +477,7 @@ def main():
             }
         ]
     )
-    meta.to_csv(meta_latest, index=False, encoding="utf-8-sig")
-    meta.to_csv(meta_hist, index=False, encoding="utf-8-sig")
+    dump_csv(meta, meta_latest, meta_hist)
 
     # ---- status（運用に必要な状態をJSONで保存） ----
     status = {
@@ -327,8 +493,11 @@ def main():
         "final_universe": final,
         "picks": picks_out["Ticker"].astype(str).tolist(),
     }
-    (OUT_DIR / "status_latest.json").write_text(json.dumps(status, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    (HIST_DIR / f"status_{asof}.json").write_text(json.dumps(status, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    dump_text(
+        json.dumps(status, ensure_ascii=False, indent=2) + "\n",
+        OUT_DIR / "status_latest.json",
+        HIST_DIR / f"status_{asof}.json",
+    )
 
     # ---- orders（先月との差分からADD/DROPのみ） ----
     prev_picks = load_prev_picks_from_history(HIST_DIR, asof)
@@ -343,21 +512,22 @@ def main():
 
     orders_latest = OUT_DIR / "orders_latest.csv"
     orders_hist = HIST_DIR / f"orders_{asof}.csv"
-    orders.to_csv(orders_latest, index=False, encoding="utf-8-sig")
-    orders.to_csv(orders_hist, index=False, encoding="utf-8-sig")
+    dump_csv(orders, orders_latest, orders_hist)
 
     # ---- screen_all（FALSE含む全件） ----
-    rp = ranked[["rank", "pick"]].copy().reset_index(names="Ticker")
-    screen_all = table.copy().reset_index(names="Ticker").merge(rp, on="Ticker", how="left")
+    # table と ranked は同じ Ticker index なので merge せず reindex で載せる
+    screen_all = table.copy()
+    screen_all["rank"] = ranked["rank"].reindex(table.index)
+    screen_all["pick"] = ranked["pick"].reindex(table.index)
 
     screen_all["fail_liq"] = ~screen_all["liq_ok"].fillna(False)
     screen_all["fail_dup"] = screen_all["dup_drop"].fillna(False)
     screen_all["fail_trend"] = ~screen_all["trend_ok"].fillna(False)
+    screen_all = screen_all.reset_index(names="Ticker")
 
     screen_all_latest = OUT_DIR / "screen_all_latest.csv"
     screen_all_hist = HIST_DIR / f"screen_all_{asof}.csv"
-    screen_all.to_csv(screen_all_latest, index=False, encoding="utf-8-sig")
-    screen_all.to_csv(screen_all_hist, index=False, encoding="utf-8-sig")
+    dump_csv(screen_all, screen_all_latest, screen_all_hist)
 
     print("ASOF:", asof)
     print("Final Universe:", final)
@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
-import re
+import os
+import shutil
+import string
+import numpy as np
 import pandas as pd
 import html as html_escape
 
@@ -13,53 +18,270 @@ DOCS_DIR = Path("docs")
 HIST_SRC = OUT_DIR / "history"
 HIST_DST = DOCS_DIR / "history"
 
+# Arrow のマルチスレッドCSVリーダー（pandas既定のCパーサより速い）
+CSV_ENGINE = "pyarrow"
+# Ticker は読み込み時に文字列型にしておく（後段で astype(str) しない）
+CSV_DTYPES = {"Ticker": "string[pyarrow]"}
+# この行数以上の表だけ列単位の自前ライタで出す（小さい表は to_html の方が速い）
+FAST_HTML_MIN_ROWS = 500
+
 DOCS_DIR.mkdir(exist_ok=True)
 HIST_DST.mkdir(parents=True, exist_ok=True)
 
+# ---- ページのCSS/テンプレート（呼び出しごとに作り直さない） ----
+CSS = """
+body{font-family:system-ui,-apple-system,BlinkMacSystemFont,"Segoe UI",sans-serif; margin:24px;}
+h1,h2{margin:0.2em 0;}
+.meta{color:#444; margin-bottom:16px;}
+.box{border:1px solid #ddd; border-radius:10px; padding:12px; margin:12px 0;}
+table{border-collapse:collapse; width:100%; font-size:14px;}
+th,td{border:1px solid #ddd; padding:6px; text-align:left;}
+th{background:#f6f6f6;}
+.small{font-size:12px; color:#666;}
+.grid2{display:grid; grid-template-columns: 1fr 1fr; gap:12px;}
+details > summary{cursor:pointer; padding:6px 0;}
+footer{margin-top:18px; color:#777; font-size:12px;}
+/* diff table row highlights */
+.row-add{background:#eaffea;}
+.row-drop{background:#ffecec;}
+.row-keep{background:#f7f7f7;}
+"""
+
+PAGE_TEMPLATE = string.Template("""<!doctype html>
+<html lang="ja">
+<head>
+<meta charset="utf-8"/>
+<meta name="viewport" content="width=device-width,initial-scale=1"/>
+<title>Trend Follow Screen - ${asof}</title>
+<style>${css}</style>
+</head>
+<body>
+<h1>Trend Follow Screen</h1>
+
+<div class="meta">
+  <div>ASOF（月末）: <b>${asof}</b></div>
+  <div>生成時刻（UTC）: ${gen} / 表示更新: ${now}</div>
+  <div class="small">注意：これは売買の自動執行ではなく「月次ルールのスクリーニング結果の可視化」です。</div>
+</div>
+
+<div class="box">
+  <h2>先月→今月の変更（KEEP/ADD/DROP）</h2>
+  <div class="small">先月: ${prev_asof} / 今月: ${cur_asof}</div>
+  ${diff_html}
+</div>
+
+<div class="box">
+  <h2>今月の注文（ADD/DROPのみ）</h2>
+  <p class="small"><a href="orders.csv">orders.csv</a></p>
+  ${orders_table}
+</div>
+
+<div class="box">
+  <h2>今月のPick（latest）</h2>
+  <p class="small"><a href="picks.csv">picks.csv</a></p>
+  ${picks_table}
+</div>
+
+<div class="box">
+  <h2>今月 vs 先月のPick（並べて確認）</h2>
+  <div class="grid2">
+    <div>
+      <h3 style="margin-top:0;">今月（${cur_asof}）</h3>
+      ${cur_html}
+    </div>
+    <div>
+      <h3 style="margin-top:0;">先月（${prev_asof}）</h3>
+      ${prev_html}
+    </div>
+  </div>
+</div>
+
+<div class="box">
+  <h2>ランキング（Final Universeのみ）</h2>
+  <p class="small"><a href="ranking.csv">ranking.csv</a></p>
+  ${ranking_table}
+</div>
+
+<div class="box">
+  <h2>履歴</h2>
+  ${hist_picks}
+  ${hist_orders}
+  ${hist_screen}
+</div>
+
+<div class="box">
+  <h2>メタ</h2>
+  <p class="small"><a href="meta.csv">meta.csv</a></p>
+  ${meta_table}
+</div>
+
+<div class="box">
+  <h2>スクリーニング全結果（参考：FALSE含む）</h2>
+  <p class="small"><a href="screen_all.csv">screen_all.csv</a></p>
+  <details>
+    <summary>表示する（落選理由も含む）</summary>
+    ${screen_all_table}
+  </details>
+</div>
+
+<footer>DASHBOARD_VERSION: ${ver}</footer>
+<script>
+// <div class="csv-table" data-src="..."> は、親の <details> を開いたときに CSV を取得して表にする
+document.querySelectorAll(".csv-table").forEach(function (box) {
+  var details = box.closest("details");
+  details.addEventListener("toggle", function () {
+    if (!details.open || box.dataset.loaded) return;
+    box.dataset.loaded = "1";
+    box.textContent = "(読み込み中...)";
+    fetch(box.dataset.src).then(function (r) {
+      if (!r.ok) throw new Error(r.status);
+      return r.text();
+    }).then(function (text) {
+      box.replaceChildren(csvTable(parseCsv(text.replace(/^\\uFEFF/, ""))));
+    }).catch(function () {
+      box.textContent = "(" + box.dataset.src + " を読み込めませんでした)";
+    });
+  });
+});
+
+function parseCsv(text) {
+  var rows = [], row = [], field = "", quoted = false;
+  for (var i = 0; i < text.length; i++) {
+    var c = text[i];
+    if (quoted) {
+      if (c === '"' && text[i + 1] === '"') { field += '"'; i++; }
+      else if (c === '"') quoted = false;
+      else field += c;
+    } else if (c === '"') quoted = true;
+    else if (c === ",") { row.push(field); field = ""; }
+    else if (c === "\\n") { row.push(field); rows.push(row); row = []; field = ""; }
+    else if (c !== "\\r") field += c;
+  }
+  if (field !== "" || row.length) { row.push(field); rows.push(row); }
+  return rows;
+}
+
+function csvTable(rows) {
+  var table = document.createElement("table");
+  var body = table.createTBody();
+  rows.forEach(function (r, k) {
+    var tr = k === 0 ? table.createTHead().insertRow() : body.insertRow();
+    r.forEach(function (v) {
+      var cell = document.createElement(k === 0 ? "th" : "td");
+      cell.textContent = v;
+      tr.appendChild(cell);
+    });
+  });
+  return table;
+}
+</script>
+</body>
+</html>
+""")
+
 
 def read_csv(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(f"missing: {path}")
-    return pd.read_csv(path)
+    return pd.read_csv(path, engine=CSV_ENGINE, dtype=CSV_DTYPES)
 
 
-def safe_copy(src: Path, dst: Path):
+def read_csv_optional(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, engine=CSV_ENGINE, dtype=CSV_DTYPES) if path.exists() else pd.DataFrame()
+
+
+def has_data_rows(path: Path) -> bool:
+    # ヘッダの次に1行でもあればデータありとみなす（全件はパースしない）
+    if not path.exists():
+        return False
+    with open(path, "rb") as fh:
+        fh.readline()
+        return bool(fh.readline().strip())
+
+
+def write_text(path: Path, text: str):
+    # 1MiB バッファで write() を1回にまとめる。改行は OS によらず LF
+    with open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 20) as fh:
+        fh.write(text)
+
+
+def safe_copy(src: Path, dst: Path, skip_if_same: bool = False):
+    # skip_if_same は日付ごとに不変な履歴ファイル専用。サイズが同じで dst の方が新しければコピー済みとみなす
+    # （latest 系は毎回同じサイズで上書きされるので必ずコピーする）
+    if skip_if_same and dst.exists():
+        s, d = src.stat(), dst.stat()
+        if d.st_size == s.st_size and d.st_mtime >= s.st_mtime:
+            return
     dst.parent.mkdir(parents=True, exist_ok=True)
-    dst.write_bytes(src.read_bytes())
+    shutil.copyfile(src, dst)
 
 
-def latest_history_files(pattern: str, k: int = 12) -> list[Path]:
-    if not HIST_SRC.exists():
-        return []
-    files = sorted(HIST_SRC.glob(pattern))
-    return files[-k:]
+# list_dir のプロセス内キャッシュ（path -> 名前順のファイル一覧）。
+# 自動では更新されないので、中身を書き換えたディレクトリは invalidate_dir で捨てること
+_DIR_CACHE: dict[Path, tuple[Path, ...]] = {}
 
 
-def copy_history_to_docs():
-    patterns = ["picks_*.csv", "orders_*.csv", "screen_all_*.csv", "meta_*.csv", "asof_*.txt"]
-    for pat in patterns:
-        for f in latest_history_files(pat, k=12):
-            safe_copy(f, HIST_DST / f.name)
+def list_dir(path: Path) -> tuple[Path, ...]:
+    """
+    ディレクトリ内のファイル一覧（名前順）。os.scandir 1回で取り、以降はキャッシュを返す。
+    """
+    if path not in _DIR_CACHE:
+        if not path.exists():
+            return ()
+        with os.scandir(path) as it:
+            _DIR_CACHE[path] = tuple(sorted(Path(e.path) for e in it if e.is_file()))
+    return _DIR_CACHE[path]
+
+
+def invalidate_dir(path: Path):
+    _DIR_CACHE.pop(path, None)
+
+
+def history_files(path: Path, prefix: str, suffix: str = ".csv") -> list[Path]:
+    """
+    {prefix}_*{suffix} に当たるファイル（名前順）
+    """
+    head = f"{prefix}_"
+    return [p for p in list_dir(path) if p.name.startswith(head) and p.name.endswith(suffix)]
+
+
+def copy_history_to_docs(k: int = 12):
+    patterns = [("picks", ".csv"), ("orders", ".csv"), ("screen_all", ".csv"), ("meta", ".csv"), ("asof", ".txt")]
+
+    # 1回の走査で (prefix, 拡張子) ごとに振り分ける。名前順なので各バケットも日付順
+    buckets: dict[tuple[str, str], list[Path]] = defaultdict(list)
+    for p in list_dir(HIST_SRC):
+        prefix, _, _ = p.stem.rpartition("_")
+        buckets[(prefix, p.suffix)].append(p)
+
+    for key in patterns:
+        for f in buckets[key][-k:]:
+            safe_copy(f, HIST_DST / f.name, skip_if_same=True)
+    # 変わったのは docs/history だけ。out/history の一覧はそのまま使い回す
+    invalidate_dir(HIST_DST)
 
 
 def build_history_links(prefix: str, title: str) -> str:
-    files = sorted(HIST_DST.glob(f"{prefix}_*.csv"), reverse=True)
+    files = history_files(HIST_DST, prefix)[::-1]
     if not files:
         return f"<p>({title}: 履歴なし)</p>"
-    items = [f'<li><a href="history/{f.name}">{f.name}</a></li>' for f in files]
-    return "<div><div class='small'><b>{}</b></div><ul>{}</ul></div>".format(title, "".join(items))
+    items = "".join(f'<li><a href="history/{f.name}">{f.name}</a></li>' for f in files)
+    return "<div><div class='small'><b>{}</b></div><ul>{}</ul></div>".format(title, items)
 
 
 def extract_date_from_name(stem: str, prefix: str) -> str:
-    m = re.match(rf"{re.escape(prefix)}_(\d{{4}}-\d{{2}}-\d{{2}})$", stem)
-    return m.group(1) if m else ""
+    # "{prefix}_YYYY-MM-DD" は固定幅なので正規表現を使わず位置で判定する
+    head = f"{prefix}_"
+    if not stem.startswith(head):
+        return ""
+    d = stem[len(head):]
+    if len(d) == 10 and d[4] == "-" and d[7] == "-" and (d[:4] + d[5:7] + d[8:]).isdigit():
+        return d
+    return ""
 
 
 def load_latest_and_prev_from_history(prefix: str) -> tuple[pd.DataFrame, pd.DataFrame, str, str]:
-    if not HIST_SRC.exists():
-        return pd.DataFrame(), pd.DataFrame(), "(none)", "(none)"
-
-    files = sorted(HIST_SRC.glob(f"{prefix}_*.csv"))
+    files = history_files(HIST_SRC, prefix)
     dated: list[tuple[str, Path]] = []
     for f in files:
         d = extract_date_from_name(f.stem, prefix)
@@ -71,11 +293,11 @@ def load_latest_and_prev_from_history(prefix: str) -> tuple[pd.DataFrame, pd.Dat
         return pd.DataFrame(), pd.DataFrame(), "(none)", "(none)"
 
     cur_asof, cur_file = dated[-1]
-    cur = pd.read_csv(cur_file)
+    cur = pd.read_csv(cur_file, engine=CSV_ENGINE, dtype=CSV_DTYPES)
 
     if len(dated) >= 2:
         prev_asof, prev_file = dated[-2]
-        prev = pd.read_csv(prev_file)
+        prev = pd.read_csv(prev_file, engine=CSV_ENGINE, dtype=CSV_DTYPES)
     else:
         prev_asof = "(none)"
         prev = pd.DataFrame(columns=cur.columns)
@@ -89,28 +311,32 @@ def diff_picks(cur: pd.DataFrame, prev: pd.DataFrame) -> pd.DataFrame:
     if prev is None or prev.empty or "Ticker" not in prev.columns:
         prev = pd.DataFrame(columns=["Ticker"])
 
-    cur_set = set(cur["Ticker"].astype(str))
-    prev_set = set(prev["Ticker"].astype(str))
-
-    keep = sorted(cur_set & prev_set)
-    add = sorted(cur_set - prev_set)
-    drop = sorted(prev_set - cur_set)
-
-    rows = [{"Ticker": t, "action": "KEEP"} for t in keep] + \
-           [{"Ticker": t, "action": "ADD"} for t in add] + \
-           [{"Ticker": t, "action": "DROP"} for t in drop]
-
-    out = pd.DataFrame(rows)
-    order = {"KEEP": 0, "ADD": 1, "DROP": 2}
-    if not out.empty:
-        out["__o"] = out["action"].map(order)
-        out = out.sort_values(["__o", "Ticker"]).drop(columns="__o")
-    return out
+    # np.unique はソート済みを返すので、各グループはそのまま Ticker 昇順
+    # 固定幅の str にすると NA 混じりで全要素が1文字に切れるので object のまま扱う
+    cur_arr = np.unique(cur["Ticker"].dropna().to_numpy(dtype=object))
+    prev_arr = np.unique(prev["Ticker"].dropna().to_numpy(dtype=object))
+
+    # 月次ピックは前月と同じことが多い。ソート済み配列が一致すれば全件 KEEP
+    if np.array_equal(cur_arr, prev_arr):
+        return pd.DataFrame({"Ticker": cur_arr.astype(object), "action": "KEEP"})
+
+    in_prev = np.isin(cur_arr, prev_arr)
+    keep = cur_arr[in_prev]
+    add = cur_arr[~in_prev]
+    drop = prev_arr[~np.isin(prev_arr, cur_arr)]
+
+    return pd.DataFrame(
+        {
+            "Ticker": np.concatenate([keep, add, drop]).astype(object),
+            "action": np.repeat(np.array(["KEEP", "ADD", "DROP"], dtype=object), [keep.size, add.size, drop.size]),
+        }
+    )
 
 
 def df_to_html_table_with_action_class(df: pd.DataFrame) -> str:
     """
     jinja2不要。action列がある場合は行に class を付与してCSSで色付け。
+    行は列単位で文字列を連結して作る（セルごとの Python 整形をしない）。
     """
     if df is None or df.empty:
         return "<p>(なし)</p>"
@@ -118,21 +344,40 @@ def df_to_html_table_with_action_class(df: pd.DataFrame) -> str:
     cols = list(df.columns)
     thead = "<thead><tr>" + "".join(f"<th>{html_escape.escape(str(c))}</th>" for c in cols) + "</tr></thead>"
 
-    body_rows = []
-    for _, r in df.iterrows():
-        action = str(r.get("action", "")).upper()
-        cls = ""
-        if action in ("ADD", "DROP", "KEEP"):
-            cls = f' class="row-{action.lower()}"'
-        tds = "".join(f"<td>{html_escape.escape(str(r.get(c, '')))}</td>" for c in cols)
-        body_rows.append(f"<tr{cls}>{tds}</tr>")
+    # float は有効6桁（欠損は NaN）、それ以外は str() で整形し、列ごとにエスケープする
+    cells = pd.Series("", index=df.index, dtype=object)
+    for c in cols:
+        s = df[c]
+        if pd.api.types.is_float_dtype(s.dtype):
+            col = s.map("{:.6g}".format).where(s.notna(), "NaN")
+        else:
+            col = s.map(str)
+        cells = cells + "<td>" + col.map(html_escape.escape).astype(object) + "</td>"
+
+    if "action" in df.columns:
+        action = df["action"].map(str).str.upper()
+        cls = pd.Series(
+            np.where(action.isin(["ADD", "DROP", "KEEP"]), ' class="row-' + action.str.lower() + '"', ""),
+            index=df.index,
+            dtype=object,
+        )
+    else:
+        cls = pd.Series("", index=df.index, dtype=object)
 
-    tbody = "<tbody>" + "".join(body_rows) + "</tbody>"
+    rows = "<tr" + cls + ">" + cells + "</tr>"
+    tbody = "<tbody>" + "".join(rows.tolist()) + "</tbody>"
     return f"<table>{thead}{tbody}</table>"
 
 
+def render_table(df: pd.DataFrame) -> str:
+    # 小さい表は to_html のまま。大きい表だけ列単位のライタに回す
+    if len(df) >= FAST_HTML_MIN_ROWS:
+        return df_to_html_table_with_action_class(df)
+    return df.to_html(index=False)
+
+
 def build_html(meta: pd.DataFrame, picks: pd.DataFrame, ranking: pd.DataFrame,
-               orders: pd.DataFrame, screen_all: pd.DataFrame) -> str:
+               orders: pd.DataFrame, has_screen_all: bool) -> str:
     asof = meta.loc[0, "asof_month_end"] if len(meta) else ""
     gen = meta.loc[0, "generated_at_utc"] if len(meta) else ""
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
@@ -145,117 +390,24 @@ def build_html(meta: pd.DataFrame, picks: pd.DataFrame, ranking: pd.DataFrame,
     diff = diff_picks(cur_picks_h, prev_picks_h)
     diff_html = df_to_html_table_with_action_class(diff)
 
-    picks_table = picks.to_html(index=False) if len(picks) else "<p>(picks.csv がありません)</p>"
-    ranking_table = ranking.to_html(index=False) if len(ranking) else "<p>(ranking.csv がありません)</p>"
-    meta_table = meta.to_html(index=False) if len(meta) else "<p>(meta.csv がありません)</p>"
-
-    orders_table = orders.to_html(index=False) if len(orders) else "<p>(注文なし＝先月から変更なし)</p>"
-
-    cur_html = cur_picks_h.to_html(index=False) if len(cur_picks_h) else "<p>(今月picks履歴がありません)</p>"
-    prev_html = prev_picks_h.to_html(index=False) if len(prev_picks_h) else "<p>(先月なし)</p>"
-
-    screen_all_table = screen_all.to_html(index=False) if len(screen_all) else "<p>(screen_all.csv がありません)</p>"
-
-    css = """
-body{font-family:system-ui,-apple-system,BlinkMacSystemFont,"Segoe UI",sans-serif; margin:24px;}
-h1,h2{margin:0.2em 0;}
-.meta{color:#444; margin-bottom:16px;}
-.box{border:1px solid #ddd; border-radius:10px; padding:12px; margin:12px 0;}
-table{border-collapse:collapse; width:100%; font-size:14px;}
-th,td{border:1px solid #ddd; padding:6px; text-align:left;}
-th{background:#f6f6f6;}
-.small{font-size:12px; color:#666;}
-.grid2{display:grid; grid-template-columns: 1fr 1fr; gap:12px;}
-details > summary{cursor:pointer; padding:6px 0;}
-footer{margin-top:18px; color:#777; font-size:12px;}
-/* diff table row highlights */
-.row-add{background:#eaffea;}
-.row-drop{background:#ffecec;}
-.row-keep{background:#f7f7f7;}
-"""
-
-    html = """<!doctype html>
-<html lang="ja">
-<head>
-<meta charset="utf-8"/>
-<meta name="viewport" content="width=device-width,initial-scale=1"/>
-<title>Trend Follow Screen - {asof}</title>
-<style>{css}</style>
-</head>
-<body>
-<h1>Trend Follow Screen</h1>
-
-<div class="meta">
-  <div>ASOF（月末）: <b>{asof}</b></div>
-  <div>生成時刻（UTC）: {gen} / 表示更新: {now}</div>
-  <div class="small">注意：これは売買の自動執行ではなく「月次ルールのスクリーニング結果の可視化」です。</div>
-</div>
-
-<div class="box">
-  <h2>先月→今月の変更（KEEP/ADD/DROP）</h2>
-  <div class="small">先月: {prev_asof} / 今月: {cur_asof}</div>
-  {diff_html}
-</div>
-
-<div class="box">
-  <h2>今月の注文（ADD/DROPのみ）</h2>
-  <p class="small"><a href="orders.csv">orders.csv</a></p>
-  {orders_table}
-</div>
-
-<div class="box">
-  <h2>今月のPick（latest）</h2>
-  <p class="small"><a href="picks.csv">picks.csv</a></p>
-  {picks_table}
-</div>
-
-<div class="box">
-  <h2>今月 vs 先月のPick（並べて確認）</h2>
-  <div class="grid2">
-    <div>
-      <h3 style="margin-top:0;">今月（{cur_asof}）</h3>
-      {cur_html}
-    </div>
-    <div>
-      <h3 style="margin-top:0;">先月（{prev_asof}）</h3>
-      {prev_html}
-    </div>
-  </div>
-</div>
-
-<div class="box">
-  <h2>ランキング（Final Universeのみ）</h2>
-  <p class="small"><a href="ranking.csv">ranking.csv</a></p>
-  {ranking_table}
-</div>
+    picks_table = render_table(picks) if len(picks) else "<p>(picks.csv がありません)</p>"
+    ranking_table = render_table(ranking) if len(ranking) else "<p>(ranking.csv がありません)</p>"
+    meta_table = render_table(meta) if len(meta) else "<p>(meta.csv がありません)</p>"
 
-<div class="box">
-  <h2>履歴</h2>
-  {hist_picks}
-  {hist_orders}
-  {hist_screen}
-</div>
+    orders_table = render_table(orders) if len(orders) else "<p>(注文なし＝先月から変更なし)</p>"
 
-<div class="box">
-  <h2>メタ</h2>
-  <p class="small"><a href="meta.csv">meta.csv</a></p>
-  {meta_table}
-</div>
+    cur_html = render_table(cur_picks_h) if len(cur_picks_h) else "<p>(今月picks履歴がありません)</p>"
+    prev_html = render_table(prev_picks_h) if len(prev_picks_h) else "<p>(先月なし)</p>"
 
-<div class="box">
-  <h2>スクリーニング全結果（参考：FALSE含む）</h2>
-  <p class="small"><a href="screen_all.csv">screen_all.csv</a></p>
-  <details>
-    <summary>表示する（落選理由も含む）</summary>
-    {screen_all_table}
-  </details>
-</div>
+    # 全件表は <details> を開いたときだけ JS で screen_all.csv から組み立てる（HTMLに埋め込まない）
+    if has_screen_all:
+        screen_all_table = '<div class="csv-table" data-src="screen_all.csv"></div>'
+    else:
+        screen_all_table = "<p>(screen_all.csv がありません)</p>"
 
-<footer>DASHBOARD_VERSION: {ver}</footer>
-</body>
-</html>
-""".format(
-        css=css,
+    # テンプレートはモジュール定数。string.Template で1パス置換する
+    return PAGE_TEMPLATE.substitute(
+        css=CSS,
         asof=asof,
         gen=gen,
         now=now,
@@ -274,7 +426,6 @@ footer{margin-top:18px; color:#777; font-size:12px;}
         screen_all_table=screen_all_table,
         ver=DASHBOARD_VERSION,
     )
-    return html
 
 
 def main():
@@ -286,12 +437,17 @@ def main():
     screen_all_path = OUT_DIR / "screen_all_latest.csv"
     status_path = OUT_DIR / "status_latest.json"
 
-    ranking = read_csv(ranking_path)
-    picks = read_csv(picks_path)
-    meta = read_csv(meta_path)
+    # CSVパースはGILを離すので4本まとめて並行に読む（screen_all は JS で読むのでパースしない）
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        ranking_f = ex.submit(read_csv, ranking_path)
+        picks_f = ex.submit(read_csv, picks_path)
+        meta_f = ex.submit(read_csv, meta_path)
+        orders_f = ex.submit(read_csv_optional, orders_path)
 
-    orders = pd.read_csv(orders_path) if orders_path.exists() else pd.DataFrame()
-    screen_all = pd.read_csv(screen_all_path) if screen_all_path.exists() else pd.DataFrame()
+        ranking = ranking_f.result()
+        picks = picks_f.result()
+        meta = meta_f.result()
+        orders = orders_f.result()
 
     # docsに最新コピー
     safe_copy(ranking_path, DOCS_DIR / "ranking.csv")
@@ -301,12 +457,12 @@ def main():
     if orders_path.exists():
         safe_copy(orders_path, DOCS_DIR / "orders.csv")
     else:
-        (DOCS_DIR / "orders.csv").write_text("Ticker,action,side,qty,ref_price,note\n", encoding="utf-8")
+        write_text(DOCS_DIR / "orders.csv", "Ticker,action,side,qty,ref_price,note\n")
 
     if screen_all_path.exists():
         safe_copy(screen_all_path, DOCS_DIR / "screen_all.csv")
     else:
-        (DOCS_DIR / "screen_all.csv").write_text("", encoding="utf-8")
+        write_text(DOCS_DIR / "screen_all.csv", "")
 
     if status_path.exists():
         safe_copy(status_path, DOCS_DIR / "status.json")
@@ -315,8 +471,8 @@ def main():
     copy_history_to_docs()
 
     # HTML生成
-    html = build_html(meta, picks, ranking, orders, screen_all)
-    (DOCS_DIR / "index.html").write_text(html, encoding="utf-8")
+    html = build_html(meta, picks, ranking, orders, has_data_rows(screen_all_path))
+    write_text(DOCS_DIR / "index.html", html)
 
     print("make_dashboard.py:", DASHBOARD_VERSION)
     print("wrote:", DOCS_DIR / "index.html")